@@ -8,6 +8,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -15,6 +16,8 @@ from sqlalchemy import (
     func,
 )
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -25,6 +28,40 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for work that runs on the event loop, e.g. move jobs.
+# The move job's statements have fixed SQL text, so the driver's default prepared
+# statement caches already parse/plan each once per connection and reuse it.
+ASYNC_DATABASE_URL = make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+# Behind PgBouncer in transaction pooling mode, a server connection can change between
+# transactions, so cached/named prepared statements collide. DB_PGBOUNCER=1 disables
+# both caches and gives every prepared statement a unique name.
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', '').lower() in ('1', 'true', 'yes')
+ASYNC_CONNECT_ARGS = {
+    "statement_cache_size": 0,
+    "prepared_statement_cache_size": 0,
+    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+} if DB_PGBOUNCER else {}
+
+# Pool sizing for the async engine. The move worker derives its jobs-per-worker from
+# DB_POOL_SIZE + DB_MAX_OVERFLOW and MOVE_CONCURRENCY, and refuses to start if an
+# explicit MOVE_WORKER_MAX_JOBS would need more connections than the pool allows.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args=ASYNC_CONNECT_ARGS,
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -32,6 +69,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 
 # SQLAlchemy models
 Base = declarative_base()
@@ -63,7 +104,10 @@ class CompanyCollectionAssociation(Base):
     __tablename__ = "company_collection_associations"
 
     __table_args__ = (
+        # Also backs ON CONFLICT (company_id, collection_id) and the NOT EXISTS probes
         UniqueConstraint('company_id', 'collection_id', name='uq_company_collection'),
+        # List scans: count/page a collection by company_id as an index-only scan
+        Index('ix_company_collection_collection_company', 'collection_id', 'company_id'),
     )
     
     created_at: Union[datetime, Column[datetime]] = Column(
@@ -0,0 +1,41 @@
+# app/queue.py
+import asyncio
+import os
+from typing import Optional
+
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+
+# Unset => no Redis: move jobs run in-process and job state stays in memory (dev only)
+REDIS_URL = os.getenv('REDIS_URL')
+
+_redis: Optional[ArqRedis] = None
+# Created lazily so it binds to the running event loop (Python 3.9 binds at construction)
+_redis_lock: Optional[asyncio.Lock] = None
+
+def redis_settings() -> RedisSettings:
+    return RedisSettings.from_dsn(REDIS_URL or "redis://localhost:6379")
+
+def set_redis(pool: ArqRedis) -> None:
+    """
+    Use an existing pool (e.g. the arq worker's ctx["redis"]) instead of creating one.
+    """
+    global _redis
+    _redis = pool
+
+async def get_redis() -> Optional[ArqRedis]:
+    """
+    Shared arq pool (also a plain async Redis client), created on first use.
+    Returns None when REDIS_URL is not configured.
+    """
+    global _redis, _redis_lock
+    if REDIS_URL is None:
+        return None
+    if _redis is None:
+        if _redis_lock is None:
+            _redis_lock = asyncio.Lock()
+        async with _redis_lock:
+            # Concurrent first callers wait here and reuse the pool the winner created
+            if _redis is None:
+                _redis = await create_pool(redis_settings())
+    return _redis
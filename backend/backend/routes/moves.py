@@ -1,22 +1,143 @@
+import os
+import json
+import hashlib
 import uuid
 import asyncio
 import time
-from typing import Dict, List, Optional, TypedDict
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, TypedDict
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import BaseModel, model_validator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 
-from backend.db import database
+from backend.db import database, queue
 
 router = APIRouter(prefix="/moves", tags=["moves"])
 
+# Largest ids/excludeIds list accepted in one request (rejected with 422 above this).
+MAX_IDS_PER_REQUEST = int(os.getenv("MAX_IDS_PER_REQUEST", "100000"))
+
+# Rows per INSERT round-trip. The ids travel as a single array parameter,
+# so this is not bounded by Postgres' 65535 bind-parameter limit.
+MOVE_BATCH_SIZE = int(os.getenv("MOVE_BATCH_SIZE", "1000"))
+
+# Chunks inserted in parallel per job, each on its own pooled connection.
+MOVE_CONCURRENCY = int(os.getenv("MOVE_CONCURRENCY", "4"))
+
+# Explicit selections at least this large skip chunked INSERTs: the ids are COPY'd
+# into a temp table and inserted with one INSERT ... SELECT.
+MOVE_COPY_THRESHOLD = int(os.getenv("MOVE_COPY_THRESHOLD", "50000"))
+
+# Chunks per transaction, and the longest a transaction may stay open (checked
+# between chunks). Grouping chunks amortizes WAL flushes; rows only become visible
+# and count as progress once committed. Fast chunks commit in groups of
+# MOVE_COMMIT_EVERY; slow ones (e.g. ~100s under the seeded per-row trigger) exceed
+# MOVE_COMMIT_INTERVAL on their own and so commit one at a time.
+MOVE_COMMIT_EVERY = int(os.getenv("MOVE_COMMIT_EVERY", "10"))
+MOVE_COMMIT_INTERVAL = float(os.getenv("MOVE_COMMIT_INTERVAL", "5"))
+
+# Progress is flushed to the job store once this many rows are pending,
+# or MOVE_PROGRESS_FLUSH_INTERVAL seconds after the last flush, whichever first.
+MOVE_PROGRESS_FLUSH_ROWS = int(os.getenv("MOVE_PROGRESS_FLUSH_ROWS", "1000"))
+MOVE_PROGRESS_FLUSH_INTERVAL = float(os.getenv("MOVE_PROGRESS_FLUSH_INTERVAL", "0.25"))
+
+# How long a selection.all count is reused (e.g. when the user retries a failed move).
+# Cached counts for a list are also dropped whenever a move job writes into it.
+MOVE_COUNT_CACHE_TTL = int(os.getenv("MOVE_COUNT_CACHE_TTL", "60"))
+
+# How long job status is kept in Redis after its last update
+MOVE_JOB_TTL = int(os.getenv("MOVE_JOB_TTL", "3600"))
+
+# One SQL text regardless of chunk size => the statement is parsed/planned once.
+# Existing rows are filtered with an anti-join so duplicates cost one batched read
+# instead of a per-row conflict check; ON CONFLICT only guards concurrent writers.
+# No RETURNING: the command tag's row count already says how many rows were new.
+_INSERT_ASSOCIATIONS = text(
+    """
+    INSERT INTO company_collection_associations (company_id, collection_id)
+    SELECT c, CAST(:lid AS uuid) FROM unnest(CAST(:cids AS integer[])) AS t(c)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM company_collection_associations a
+        WHERE a.company_id = t.c AND a.collection_id = CAST(:lid AS uuid)
+    )
+    ON CONFLICT (company_id, collection_id) DO NOTHING
+    """
+).bindparams(
+    bindparam("cids", type_=ARRAY(Integer)),
+    bindparam("lid", type_=UUID(as_uuid=True)),
+)
+
+# COPY path: ids are staged in a per-transaction temp table first.
+_CREATE_COPY_STAGING = text(
+    "CREATE TEMP TABLE _moves (company_id integer) ON COMMIT DROP"
+)
+_INSERT_ASSOCIATIONS_FROM_STAGING = text(
+    """
+    INSERT INTO company_collection_associations (company_id, collection_id)
+    SELECT DISTINCT m.company_id, CAST(:lid AS uuid) FROM _moves m
+    WHERE NOT EXISTS (
+        SELECT 1 FROM company_collection_associations a
+        WHERE a.company_id = m.company_id AND a.collection_id = CAST(:lid AS uuid)
+    )
+    ON CONFLICT (company_id, collection_id) DO NOTHING
+    """
+).bindparams(bindparam("lid", type_=UUID(as_uuid=True)))
+
+# "Move all" chunk: pages through the source list by company_id (keyset) and inserts
+# straight from it, so ids never round-trip through Python. Excludes are anti-joined
+# against one array parameter, not compared per row. Returns rows scanned,
+# the last company_id scanned (next page cursor) and rows actually inserted.
+_INSERT_ASSOCIATIONS_FROM_LIST = text(
+    """
+    WITH src AS (
+        SELECT c.company_id FROM company_collection_associations c
+        WHERE c.collection_id = CAST(:source AS uuid)
+          AND c.company_id > :after
+          AND NOT EXISTS (
+              SELECT 1 FROM unnest(CAST(:excl AS integer[])) AS x(id) WHERE x.id = c.company_id
+          )
+        ORDER BY c.company_id
+        LIMIT :lim
+    ), ins AS (
+        INSERT INTO company_collection_associations (company_id, collection_id)
+        SELECT s.company_id, CAST(:lid AS uuid) FROM src s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM company_collection_associations a
+            WHERE a.company_id = s.company_id AND a.collection_id = CAST(:lid AS uuid)
+        )
+        ON CONFLICT (company_id, collection_id) DO NOTHING
+        RETURNING company_id
+    )
+    SELECT (SELECT count(*) FROM src), (SELECT max(company_id) FROM src), (SELECT count(*) FROM ins)
+    """
+).bindparams(
+    bindparam("source", type_=UUID(as_uuid=True)),
+    bindparam("lid", type_=UUID(as_uuid=True)),
+    bindparam("excl", type_=ARRAY(Integer)),
+)
+
+# Size of a selection.all move. Excludes are bound as one array and anti-joined
+# (hashed once) rather than expanded into an IN list with a parameter per id.
+_COUNT_SOURCE_COMPANIES = text(
+    """
+    SELECT count(*) FROM company_collection_associations a
+    WHERE a.collection_id = CAST(:source AS uuid)
+      AND NOT EXISTS (
+          SELECT 1 FROM unnest(CAST(:excl AS integer[])) AS x(id) WHERE x.id = a.company_id
+      )
+    """
+).bindparams(
+    bindparam("source", type_=UUID(as_uuid=True)),
+    bindparam("excl", type_=ARRAY(Integer)),
+)
+
 # Job status structure
 class _Job(TypedDict, total=False):
     """
-    Job status persisted in-memory.
+    Job status persisted in Redis (or in-memory when REDIS_URL is unset).
 
     Fields:
       status     : "queued" | "running" | "completed" | "failed"
@@ -35,9 +156,72 @@ class _Job(TypedDict, total=False):
     finishedAt: Optional[float]
     message: Optional[str]
 
-# In-memory job store - local for dev only
+# In-memory job store - local for dev only (no REDIS_URL)
 JOBS: Dict[str, _Job] = {}
 
+class JobStore:
+    """
+    Job status store. Each job is a Redis hash (one JSON-encoded value per field)
+    with a TTL, so any API/worker process sees the same state and progress counters
+    are bumped atomically with HINCRBY by concurrent chunk tasks.
+    Falls back to the in-memory JOBS dict when REDIS_URL is unset.
+    """
+
+    _REQUIRED_FIELDS = ("status", "moved", "total", "startedAt")
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"moves:job:{job_id}"
+
+    async def create(self, job_id: str, job: _Job) -> None:
+        await self.update(job_id, **job)
+
+    async def update(self, job_id: str, **fields) -> None:
+        redis = await queue.get_redis()
+        if redis is None:
+            JOBS.setdefault(job_id, {}).update(fields)
+            return
+        key = self._key(job_id)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={k: json.dumps(v) for k, v in fields.items()})
+            pipe.expire(key, MOVE_JOB_TTL)
+            await pipe.execute()
+
+    async def incr(self, job_id: str, moved: int, duplicates: int) -> None:
+        redis = await queue.get_redis()
+        if redis is None:
+            job = JOBS[job_id]
+            job["moved"] += moved
+            job["duplicates"] += duplicates
+            return
+        key = self._key(job_id)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, "moved", moved)
+            pipe.hincrby(key, "duplicates", duplicates)
+            # Keep a long-running job's status alive past MOVE_JOB_TTL
+            pipe.expire(key, MOVE_JOB_TTL)
+            await pipe.execute()
+
+    async def touch(self, job_id: str) -> None:
+        """Refresh the TTL without writing any fields (used while a job is running)."""
+        redis = await queue.get_redis()
+        if redis is not None:
+            await redis.expire(self._key(job_id), MOVE_JOB_TTL)
+
+    async def get(self, job_id: str) -> Optional[_Job]:
+        redis = await queue.get_redis()
+        if redis is None:
+            return JOBS.get(job_id)
+        raw = await redis.hgetall(self._key(job_id))
+        job = {k.decode(): json.loads(v) for k, v in raw.items()}
+        # A hash recreated by a late incr/update after expiry lacks the fields
+        # written at creation; treat it as gone rather than a malformed status
+        if not all(f in job for f in self._REQUIRED_FIELDS):
+            return None
+        return job
+
+job_store = JobStore()
+
 # Request/response models
 
 class Selection(BaseModel):
@@ -50,6 +234,19 @@ class Selection(BaseModel):
     all: Optional[bool] = None
     excludeIds: list[int] = []
 
+    @model_validator(mode="after")
+    def _check_shape(self) -> "Selection":
+        # Validated before the route runs, so bad payloads never reach the DB
+        if (self.ids is not None) == bool(self.all):
+            raise ValueError("Provide exactly one of selection.ids or selection.all=true")
+        if self.ids is not None and not self.ids:
+            raise ValueError("selection.ids must not be empty")
+        if len(self.ids or []) > MAX_IDS_PER_REQUEST:
+            raise ValueError(f"selection.ids exceeds {MAX_IDS_PER_REQUEST} ids")
+        if len(self.excludeIds) > MAX_IDS_PER_REQUEST:
+            raise ValueError(f"selection.excludeIds exceeds {MAX_IDS_PER_REQUEST} ids")
+        return self
+
 class StartMoveRequest(BaseModel):
     sourceListId: uuid.UUID
     targetListId: uuid.UUID
@@ -68,129 +265,368 @@ class JobStatus(BaseModel):
 # Endpoints/routes
 
 @router.post("/batch", response_model=JobStatus)
-def start_move_job(
+async def start_move_job(
     body: StartMoveRequest,
     bg: BackgroundTasks,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """
     Start a background job to move companies from source list to target list.
     Returns a JobStatus immediately; the UI polls /moves/jobs/{jobId}.
 
+    A "move" adds the companies to the target list and leaves the source list as is:
+    "My List" must keep every company, so source rows are never updated or deleted.
+
     Rely on the frontend to filter illegal targets (e.g., "My List"),
     but still block same-source/target here.
     """
     if body.sourceListId == body.targetListId:
         raise HTTPException(status_code=400, detail="Source and target lists must differ")
 
-    ids = _resolve_company_ids(db, body)
+    ids = _resolve_company_ids(body)
+    if ids is None:
+        # "Move all": only count here, the worker inserts straight from the source list
+        total = await _count_source_companies(db, body)
+    else:
+        total = len(ids)
     job_id = str(uuid.uuid4())
 
     # Initialize job status
-    JOBS[job_id] = {
+    j: _Job = {
         "status": "queued",
         "moved": 0,
-        "total": len(ids),
+        "total": total,
         "duplicates": 0,
         "startedAt": time.time(),
         "finishedAt": None,
         "message": None,
     }
+    await job_store.create(job_id, j)
+
+    # Hand off to the arq worker when Redis is configured; otherwise run in-process
+    redis = await queue.get_redis()
+    excl = list(dict.fromkeys(body.selection.excludeIds))
+    if redis is not None:
+        if ids is None:
+            await redis.enqueue_job(
+                "run_move_all_job", job_id, str(body.sourceListId), str(body.targetListId), excl
+            )
+        else:
+            await redis.enqueue_job("run_move_job", job_id, ids, str(body.targetListId))
+    else:
+        if ids is None:
+            bg.add_task(_run_move_all_job, job_id, body.sourceListId, body.targetListId, excl)
+        else:
+            bg.add_task(_run_move_job, job_id, ids, body.targetListId)
 
-    bg.add_task(_run_move_job, job_id, ids, body.targetListId)
-
-    j = JOBS[job_id]
     return JobStatus(jobId=job_id, **j)
 
 @router.get("/jobs/{job_id}", response_model=JobStatus)
-def get_job_status(job_id: str):
+async def get_job_status(job_id: str):
     """
     Get the status of a background move job by job ID.
     """
-    job = JOBS.get(job_id)
+    job = await job_store.get(job_id)
     if not job:
         raise HTTPException(404, "Job not found")
     return JobStatus(jobId=job_id, **job)
 
-def _resolve_company_ids(db: Session, body: StartMoveRequest) -> list[int]:
+def _resolve_company_ids(body: StartMoveRequest) -> Optional[list[int]]:
     """
     Resolve the list of company IDs to move based on the selection criteria.
+    Returns None for selection.all: those ids are never materialized in Python.
     """
     sel = body.selection
-    if sel.ids is not None:
-        seen, out = set(), []
-        for i in sel.ids:
-            if i not in seen:
-                seen.add(i)
-                out.append(i)
-        return out
-
     if sel.all:
-        q = (
-            select(database.CompanyCollectionAssociation.company_id)
-            .where(database.CompanyCollectionAssociation.collection_id == body.sourceListId)
-        )
-        all_ids = [row[0] for row in db.execute(q).all()]
-        excl = set(sel.excludeIds or [])
-        return [cid for cid in all_ids if cid not in excl]
+        return None
 
-    raise HTTPException(400, "Provide either selection.ids or selection.all=true")
+    # Order-preserving dedupe (Selection guarantees ids is set here)
+    return list(dict.fromkeys(sel.ids))
 
-async def _run_move_job(job_id: str, company_ids: list[int], target_list_id: uuid.UUID):
+def _list_counts_version_key(list_id: uuid.UUID) -> str:
+    return f"moves:counts-version:{list_id}"
+
+async def _count_source_companies(db: AsyncSession, body: StartMoveRequest) -> int:
     """
-    Run the background job to move companies to the target list.
+    Count the companies a selection.all move will attempt (source list minus excludes).
+    Cached in Redis for MOVE_COUNT_CACHE_TTL seconds, one key per (list, excludeIds),
+    namespaced by a per-list version that move jobs bump to invalidate.
     """
-    job = JOBS[job_id]
-    job["status"] = "running"
+    redis = await queue.get_redis()
+    excl = sorted(set(body.selection.excludeIds))
+    key = None
+    if redis is not None:
+        version = int(await redis.get(_list_counts_version_key(body.sourceListId)) or 0)
+        digest = hashlib.sha1(",".join(map(str, excl)).encode()).hexdigest()
+        key = f"moves:count:{body.sourceListId}:{version}:{digest}"
+        cached = await redis.get(key)
+        if cached is not None:
+            return int(cached)
+
+    result = await db.execute(
+        _COUNT_SOURCE_COMPANIES, {"source": body.sourceListId, "excl": excl}
+    )
+    count = result.scalar_one()
 
-    # Can tune these variables:
-    # Larger BATCH => faster total time but less granular progress updates
-    # SLEEP should be close to DB trigger delay (0.1 defined in main.py)
-    BATCH = 1
-    SLEEP = 0.1
+    if key is not None:
+        await redis.setex(key, MOVE_COUNT_CACHE_TTL, count)
+    return count
 
-    try:
-        with database.SessionLocal() as db:
-            for i in range(0, len(company_ids), BATCH):
-                chunk = company_ids[i:i + BATCH]
+async def _invalidate_list_counts(list_id: uuid.UUID) -> None:
+    """
+    Drop cached counts for a list after a move job has written into it: bumping the
+    version orphans every cached variant, which then expire on their own TTL.
+    """
+    redis = await queue.get_redis()
+    if redis is not None:
+        await redis.incr(_list_counts_version_key(list_id))
 
-                # Insert rows, counting only NEW ones via RETURNING
-                inserted = _upsert_associations(db, chunk, target_list_id)
+class _ProgressBuffer:
+    """
+    Accumulates per-chunk progress and writes it to the job store in batches:
+    once MOVE_PROGRESS_FLUSH_ROWS rows are pending or MOVE_PROGRESS_FLUSH_INTERVAL
+    seconds have passed. "duplicates" is a subset of "moved".
+    """
 
-                # Update job progress: "moved" counts all attempts, "duplicates" counts skips
-                job["moved"] += len(chunk)
-                job["duplicates"] += len(chunk) - inserted 
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.moved = 0
+        self.duplicates = 0
+        self.last_flush = time.monotonic()
+
+    def add(self, moved: int, duplicates: int) -> None:
+        self.moved += moved
+        self.duplicates += duplicates
+
+    async def flush(self, force: bool = False) -> None:
+        if not self.moved:
+            return
+        if not force and self.moved < MOVE_PROGRESS_FLUSH_ROWS \
+                and time.monotonic() - self.last_flush < MOVE_PROGRESS_FLUSH_INTERVAL:
+            return
+        # Take the deltas before awaiting so concurrent chunks don't double count
+        moved, dups = self.moved, self.duplicates
+        self.moved = self.duplicates = 0
+        self.last_flush = time.monotonic()
+        await job_store.incr(self.job_id, moved=moved, duplicates=dups)
+
+class _CommitGroup:
+    """
+    Groups chunks on one session into a transaction, committing after MOVE_COMMIT_EVERY
+    chunks or MOVE_COMMIT_INTERVAL seconds. Progress is reported only after the commit,
+    so moved/duplicates never include rows that a failure could still roll back.
+    """
 
-                # Simulate async wait for DB trigger to process
-                await asyncio.sleep(SLEEP)
+    def __init__(self, db: AsyncSession, progress: _ProgressBuffer):
+        self.db = db
+        self.progress = progress
+        self.chunks = 0
+        self.moved = 0
+        self.duplicates = 0
+        self.opened = time.monotonic()
+
+    async def add(self, moved: int, duplicates: int) -> None:
+        self.chunks += 1
+        self.moved += moved
+        self.duplicates += duplicates
+        if self.chunks >= MOVE_COMMIT_EVERY \
+                or time.monotonic() - self.opened >= MOVE_COMMIT_INTERVAL:
+            await self.commit()
+
+    async def commit(self) -> None:
+        await self.db.commit()
+        self.progress.add(moved=self.moved, duplicates=self.duplicates)
+        self.chunks = self.moved = self.duplicates = 0
+        self.opened = time.monotonic()
+        await self.progress.flush()
+
+async def _run_tracked(
+    job_id: str,
+    target_list_id: uuid.UUID,
+    work: Callable[[_ProgressBuffer], Awaitable[None]],
+):
+    """
+    Drive a move job's status: running -> completed | failed, flushing progress at the end.
+    """
+    if await job_store.get(job_id) is None:
+        return
+    # Start every run from zero so a re-run never double counts a previous attempt
+    await job_store.update(
+        job_id, status="running", moved=0, duplicates=0, message=None, finishedAt=None
+    )
+
+    async def _heartbeat() -> None:
+        # Single statements (e.g. the COPY path) can outlast MOVE_JOB_TTL without
+        # writing progress; keep the status alive until the job finishes.
+        while True:
+            await asyncio.sleep(max(1.0, MOVE_JOB_TTL / 4))
+            await job_store.touch(job_id)
 
-        job["status"] = "completed"
-        job["finishedAt"] = time.time()
+    heartbeat = asyncio.create_task(_heartbeat())
+    progress = _ProgressBuffer(job_id)
+    try:
+        await work(progress)
+        await progress.flush(force=True)
+        await job_store.update(job_id, status="completed", finishedAt=time.time())
 
     except Exception as e:
-        job["status"] = "failed"
-        job["message"] = str(e)
-        job["finishedAt"] = time.time()
+        await progress.flush(force=True)
+        await job_store.update(job_id, status="failed", message=str(e), finishedAt=time.time())
+
+    except asyncio.CancelledError:
+        # arq job_timeout or worker shutdown. The worker never retries move jobs
+        # (see WorkerSettings), so this status is final and the UI can stop polling.
+        await progress.flush(force=True)
+        await job_store.update(
+            job_id,
+            status="failed",
+            message="Move job was cancelled (timed out or worker shut down)",
+            finishedAt=time.time(),
+        )
+        raise
 
-def _upsert_associations(db: Session, company_ids: list[int], target_list_id: uuid.UUID) -> int:
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+        # Committed chunks changed the target list, even if the job failed part way
+        await _invalidate_list_counts(target_list_id)
+
+def _chunked(ids: Iterable[int], size: int) -> Iterator[list[int]]:
+    """
+    Lazily split ids into lists of at most `size`, without pre-slicing the whole input.
     """
-    Insert (company_id, target_list_id) pairs.
-    Duplicate-safe: ON CONFLICT DO NOTHING with RETURNING counts only newly inserted rows.
+    it = iter(ids)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+async def _run_move_job(job_id: str, company_ids: list[int], target_list_id: uuid.UUID):
+    """
+    Run the background job to move explicitly selected companies to the target list.
+    Runs in the arq worker (see worker.py), or in-process via BackgroundTasks in dev.
+    """
+    # Can tune these variables:
+    # Larger BATCH => fewer round-trips but less granular progress updates
+    # MOVE_CONCURRENCY should stay within the async engine's pool size
+    BATCH = max(1, MOVE_BATCH_SIZE)
+
+    async def _work(progress: _ProgressBuffer) -> None:
+        if len(company_ids) >= MOVE_COPY_THRESHOLD:
+            # Very large selection: one COPY + INSERT ... SELECT (progress lands at the end)
+            async with database.AsyncSessionLocal() as db:
+                inserted = await _copy_associations(db, company_ids, target_list_id)
+                await db.commit()
+            progress.add(moved=len(company_ids), duplicates=len(company_ids) - inserted)
+            return
+
+        chunks = _chunked(company_ids, BATCH)
+
+        async def _move_chunks() -> None:
+            # Workers share one chunk iterator; next() never awaits, so each chunk
+            # is handed out exactly once and only MOVE_CONCURRENCY are in flight.
+            # The session returns its connection to the pool at every commit, so a
+            # connection is only held for one commit group, not the whole job.
+            async with database.AsyncSessionLocal() as db:
+                group = _CommitGroup(db, progress)
+                try:
+                    for chunk in chunks:
+                        # Insert rows, counting only NEW ones via the row count
+                        inserted = await _upsert_associations(db, chunk, target_list_id)
+
+                        # Job progress: "moved" counts all attempts, "duplicates" counts skips
+                        await group.add(moved=len(chunk), duplicates=len(chunk) - inserted)
+                        # Yield between chunks; nothing is polled, so never sleep longer
+                        await asyncio.sleep(0)
+                    await group.commit()
+                except BaseException:
+                    await db.rollback()
+                    raise
+
+        tasks = [asyncio.create_task(_move_chunks()) for _ in range(max(1, MOVE_CONCURRENCY))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave sibling chunks inserting after the job is marked failed, and wait
+            # for their rollback / in-flight progress writes before the status is final
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    await _run_tracked(job_id, target_list_id, _work)
+
+async def _run_move_all_job(
+    job_id: str,
+    source_list_id: uuid.UUID,
+    target_list_id: uuid.UUID,
+    exclude_ids: list[int],
+):
+    """
+    Run the background job to move every company in the source list (minus excludes)
+    to the target list, inserting straight from the source list one keyset page at a time.
+    """
+    BATCH = max(1, MOVE_BATCH_SIZE)
+
+    async def _work(progress: _ProgressBuffer) -> None:
+        after = 0
+        async with database.AsyncSessionLocal() as db:
+            group = _CommitGroup(db, progress)
+            try:
+                while True:
+                    result = await db.execute(
+                        _INSERT_ASSOCIATIONS_FROM_LIST,
+                        {
+                            "source": source_list_id,
+                            "lid": target_list_id,
+                            "excl": exclude_ids,
+                            "after": after,
+                            "lim": BATCH,
+                        },
+                    )
+                    scanned, last_id, inserted = result.one()
+                    if not scanned:
+                        break
+
+                    await group.add(moved=scanned, duplicates=scanned - inserted)
+                    after = last_id
+                    # Yield between pages; nothing is polled, so never sleep longer
+                    await asyncio.sleep(0)
+                await group.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+
+    await _run_tracked(job_id, target_list_id, _work)
+
+async def _upsert_associations(db: AsyncSession, company_ids: list[int], target_list_id: uuid.UUID) -> int:
+    """
+    Insert (company_id, target_list_id) pairs via unnest() over an id array.
+    Duplicate-safe: existing pairs are skipped by a NOT EXISTS anti-join, and
+    the statement's row count covers only newly inserted rows (no RETURNING payload).
+    Does not commit: the caller groups chunks into transactions (_CommitGroup).
     Returns: number of rows actually inserted
     """
 
     if not company_ids:
         return 0
 
-    rows = [{"company_id": cid, "collection_id": target_list_id} for cid in company_ids]
+    result = await db.execute(_INSERT_ASSOCIATIONS, {"cids": company_ids, "lid": target_list_id})
+    return result.rowcount
+
+async def _copy_associations(db: AsyncSession, company_ids: list[int], target_list_id: uuid.UUID) -> int:
+    """
+    Bulk variant of _upsert_associations for very large selections: COPY the ids into
+    a temp table (dropped on commit), then insert the missing pairs in one statement.
+    Does not commit. Returns: number of rows actually inserted
+    """
+
+    if not company_ids:
+        return 0
 
-    stmt = (
-        pg_insert(database.CompanyCollectionAssociation)
-        .values(rows)
-        .on_conflict_do_nothing(index_elements=["company_id", "collection_id"])
-        .returning(database.CompanyCollectionAssociation.company_id)
+    await db.execute(_CREATE_COPY_STAGING)
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "_moves", records=((cid,) for cid in company_ids), columns=["company_id"]
     )
-    result = db.execute(stmt)
-    inserted_rows = result.fetchall()
-    db.commit()
-    return len(inserted_rows)
\ No newline at end of file
+    result = await db.execute(_INSERT_ASSOCIATIONS_FROM_STAGING, {"lid": target_list_id})
+    return result.rowcount
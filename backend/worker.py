@@ -0,0 +1,54 @@
+# app/worker.py
+# Run with: arq worker.WorkerSettings
+
+import os
+import uuid
+
+from backend.db import database, queue
+from backend.routes import moves
+
+# Connections the async engine can hand out at once
+_POOL_CAPACITY = database.DB_POOL_SIZE + database.DB_MAX_OVERFLOW
+
+# Concurrent move jobs per worker. Each job checks out up to MOVE_CONCURRENCY
+# connections and holds them for a whole chunk (~100s under the seeded trigger),
+# so the default is whatever fits the pool; waiting longer than pool_timeout fails.
+MOVE_WORKER_MAX_JOBS = int(
+    os.getenv("MOVE_WORKER_MAX_JOBS", max(1, _POOL_CAPACITY // max(1, moves.MOVE_CONCURRENCY)))
+)
+
+
+async def startup(ctx):
+    needed = MOVE_WORKER_MAX_JOBS * max(1, moves.MOVE_CONCURRENCY)
+    if needed > _POOL_CAPACITY:
+        raise RuntimeError(
+            f"MOVE_WORKER_MAX_JOBS x MOVE_CONCURRENCY = {needed} connections, but the pool "
+            f"allows {_POOL_CAPACITY} (DB_POOL_SIZE + DB_MAX_OVERFLOW)"
+        )
+    # Share the worker's own arq pool with the job store instead of opening a second one
+    queue.set_redis(ctx["redis"])
+
+
+async def run_move_job(ctx, job_id: str, company_ids: list[int], target_list_id: str):
+    await moves._run_move_job(job_id, company_ids, uuid.UUID(target_list_id))
+
+
+async def run_move_all_job(
+    ctx, job_id: str, source_list_id: str, target_list_id: str, exclude_ids: list[int]
+):
+    await moves._run_move_all_job(
+        job_id, uuid.UUID(source_list_id), uuid.UUID(target_list_id), exclude_ids
+    )
+
+
+class WorkerSettings:
+    functions = [run_move_job, run_move_all_job]
+    redis_settings = queue.redis_settings()
+    on_startup = startup
+    max_jobs = MOVE_WORKER_MAX_JOBS
+    # arq cancels jobs after job_timeout (default 300s). The seeded throttle trigger
+    # sleeps 0.1s per inserted row, so a 10k-row move alone takes ~1000s.
+    job_timeout = int(os.getenv("MOVE_JOB_TIMEOUT", "10800"))
+    # Never re-run a cancelled move: _run_tracked marks it failed, and that must be final
+    retry_jobs = False
+    max_tries = 1